@@ -1,13 +1,21 @@
 import streamlit as st
-import requests
+import requests_cache
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import altair as alt
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from collections import Counter
+from itertools import chain
 import time
+import threading
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import io
+import math
 
 # Настройка страницы
 st.set_page_config(
@@ -20,6 +28,130 @@ st.set_page_config(
 # API endpoints
 CROSSREF_BASE_URL = "https://api.crossref.org/works"
 OPENALEX_BASE_URL = "https://api.openalex.org/works"
+DOI_PREFIX = "https://doi.org/"
+
+# Crossref limits concurrent requests per client, keep the pool small
+CROSSREF_MAX_WORKERS = 5
+
+# OpenAlex allows 10 requests/second, keep concurrency just under the limit
+OPENALEX_MAX_WORKERS = 9
+OPENALEX_RATE_LIMIT = 9
+# Work lookups are OR-ed into one filter=doi:A|B|... query, OpenAlex accepts up to 50 values per filter
+OPENALEX_BATCH_SIZE = 50
+# Citation pages of one article are fetched concurrently too, inside the per-article workers
+# (OPENALEX_MAX_WORKERS * OPENALEX_PAGE_WORKERS stays below the connection pool size)
+OPENALEX_PAGE_WORKERS = 4
+# OpenAlex basic (page number) paging is limited to the first 10 000 results
+OPENALEX_MAX_PAGED_RESULTS = 10000
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter with multiplicative back-off on HTTP 429"""
+
+    def __init__(self, rate, capacity):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.slowed_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    # Restore the full rate once the back-off window has passed
+                    if now >= self.slowed_until:
+                        self.rate = self.max_rate
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, retry_after=None):
+        """Pause for Retry-After seconds and halve the rate for the next minute"""
+        with self.lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + (retry_after or 1.0))
+            self.updated = self.paused_until
+            self.tokens = 0
+            self.rate = max(self.rate / 2, 1)
+            self.slowed_until = now + 60
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a token from a TokenBucket before every request sent to the network"""
+
+    def __init__(self, bucket, **kwargs):
+        self.bucket = bucket
+        super().__init__(**kwargs)
+
+    # 429 is retried here instead of by urllib3, so that every resend waits for a token again
+    max_throttled_retries = 5
+
+    def send(self, request, **kwargs):
+        for attempt in range(self.max_throttled_retries + 1):
+            self.bucket.acquire()
+            response = super().send(request, **kwargs)
+            if response.status_code != 429 or attempt == self.max_throttled_retries:
+                return response
+            retry_after = response.headers.get('Retry-After')
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            self.bucket.penalize(retry_after)
+            # Release the connection back to the pool before resending
+            response.close()
+
+@st.cache_resource(show_spinner=False)
+def create_http_session():
+    """Create a shared HTTP session with connection pooling, retries and a persistent cache for Crossref/OpenAlex"""
+    # GET responses are cached on disk (URL is the key), so reruns and other ISSNs reuse them
+    session = requests_cache.CachedSession(
+        'journal_cache.sqlite',
+        backend='sqlite',
+        expire_after=timedelta(days=7),
+        allowable_codes=(200, 404),
+        stale_if_error=True
+    )
+    # Exponential back-off with jitter, so that parallel workers hitting the same error do not retry in lockstep;
+    # Retry-After of 429/503 responses is honoured by urllib3 (Crossref)
+    retries = Retry(
+        total=5,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        backoff_max=30,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+    # 429 from OpenAlex is handled by RateLimitedAdapter (through the token bucket), not by urllib3
+    openalex_retries = retries.new(status_forcelist=[500, 502, 503, 504])
+    # Cached responses never reach the adapters, so only real network requests consume tokens
+    openalex_bucket = TokenBucket(rate=OPENALEX_RATE_LIMIT, capacity=OPENALEX_RATE_LIMIT)
+    session.mount("https://api.crossref.org",
+                  HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retries))
+    # pool_block: concurrent workers wait for a pooled keep-alive connection instead of
+    # opening (and then discarding) extra connections, each with its own TLS handshake
+    session.mount("https://api.openalex.org",
+                  RateLimitedAdapter(openalex_bucket, pool_connections=20, pool_maxsize=50, pool_block=True,
+                                     max_retries=openalex_retries))
+    session.headers.update({
+        'User-Agent': 'journal-analysis/1.0 (mailto:example@email.com)',
+        'Accept-Encoding': 'gzip, deflate'
+    })
+    return session
+
+# Keep-alive connections and the rate limiter are reused across all API calls, reruns and user sessions
+# (st.cache_resource returns the same object instead of re-creating it on every script run)
+SESSION = create_http_session()
 
 def calculate_impact_factor_years():
     """Определяет годы для расчета импакт-фактора на основе текущей даты"""
@@ -38,219 +170,243 @@ def calculate_impact_factor_years():
     
     return citation_year, publication_years
 
+def _json(resp):
+    """Parse a JSON response body with orjson (several times faster than resp.json() on large pages)"""
+    return orjson.loads(resp.content)
+
+def _fetch_crossref_page(params):
+    """Fetch and parse one Crossref page, returns the 'message' part. Safe to call from worker threads"""
+    resp = SESSION.get(CROSSREF_BASE_URL, params=params, timeout=30)
+    resp.raise_for_status()
+    return _json(resp)['message']
+
 @st.cache_data(show_spinner=False, ttl=3600)
 def fetch_crossref_articles(issn, from_date, until_date):
     """Fetch articles from Crossref API with cursor-based pagination"""
     items = []
-    cursor = "*"
     progress_bar = st.progress(0)
     status_text = st.empty()
+    params = {
+        'filter': f'issn:{issn},from-pub-date:{from_date},until-pub-date:{until_date}',
+        'rows': 1000,
+        # Only the fields used by the analysis, cuts the response size several times
+        'select': 'DOI,author,published,container-title',
+        'mailto': 'example@email.com'
+    }
 
-    while True:
-        params = {
-            'filter': f'issn:{issn},from-pub-date:{from_date},until-pub-date:{until_date}',
-            'rows': 1000,
-            'cursor': cursor,
-            'mailto': 'example@email.com'
-        }
-        try:
-            resp = requests.get(CROSSREF_BASE_URL, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            message = data['message']
-            items.extend(message['items'])
+    # Double buffering: the next page is requested as soon as its cursor is known,
+    # the current page is processed while that request is in flight
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(_fetch_crossref_page, {**params, 'cursor': '*'})
+        while future:
+            try:
+                message = future.result()
+            except Exception as e:
+                st.error(f"Error fetching Crossref data after retries, results are incomplete ({len(items)} articles retrieved): {e}")
+                break
+            
+            page_items = message['items']
             cursor = message.get('next-cursor')
+            total = message.get('total-results', 0)
+            # Stop as soon as everything reported by total-results is in, no extra empty round-trip
+            if cursor and page_items and len(items) + len(page_items) < total:
+                future = executor.submit(_fetch_crossref_page, {**params, 'cursor': cursor})
+            else:
+                future = None
             
+            items.extend(page_items)
             status_text.text(f" Retrieved {len(items)} articles...")
-            if len(items) > 0:
-                progress_bar.progress(min(len(items) / 1000, 1.0))
-                
-            if not cursor or len(message['items']) == 0:
-                break
-        except Exception as e:
-            st.error(f"Error fetching Crossref data: {e}")
-            break
+            if total > 0:
+                progress_bar.progress(min(len(items) / total, 1.0))
 
     progress_bar.empty()
     status_text.empty()
     return items
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def get_openalex_work_by_doi(doi):
-    """Get work data from OpenAlex by DOI"""
-    if doi == 'N/A':
-        return None
-    
+def _fetch_openalex_work(doi):
+    """Fetch work data from OpenAlex by DOI, returns (work_data, error). Safe to call from worker threads"""
     try:
         # Normalize DOI for OpenAlex
-        if not doi.startswith('https://doi.org/'):
-            doi_url = f"https://doi.org/{doi}"
+        if not doi.startswith(DOI_PREFIX):
+            doi_url = f"{DOI_PREFIX}{doi}"
         else:
             doi_url = doi
         
         url = f"{OPENALEX_BASE_URL}/{doi_url}"
-        resp = requests.get(url, timeout=10)
+        resp = SESSION.get(url, timeout=10)
         
         if resp.status_code == 200:
-            return resp.json()
+            return _json(resp), None
         elif resp.status_code == 404:
-            return None
+            return None, None
         else:
-            st.warning(f"OpenAlex API error for {doi}: {resp.status_code}")
-            return None
+            return None, f"OpenAlex API error for {doi}: {resp.status_code}"
     except Exception as e:
-        st.warning(f"Error fetching OpenAlex data for {doi}: {e}")
-        return None
+        return None, f"Error fetching OpenAlex data for {doi}: {e}"
+
+# DOI -> (OpenAlex ID, cited_by_count) of works fetched so far, saves a work lookup before listing citations
+_citation_roots = {}
+
+def _fetch_openalex_works_batch(dois):
+    """Fetch works for up to OPENALEX_BATCH_SIZE DOIs with one filter=doi:A|B|... query, returns ({doi: work_data}, error). Thread-safe"""
+    # OpenAlex returns DOIs as lowercase https://doi.org/ URLs
+    by_url = {(doi if doi.startswith(DOI_PREFIX) else f"{DOI_PREFIX}{doi}").lower(): doi for doi in dois}
+    data, error = _fetch_openalex_page({'filter': 'doi:' + '|'.join(by_url), 'per-page': len(by_url)})
+    if error:
+        return {}, f"Error fetching OpenAlex data for {len(dois)} articles: {error}"
+
+    works = {}
+    for work in data.get('results', []):
+        doi = by_url.get((work.get('doi') or '').lower())
+        if doi and doi not in works:
+            works[doi] = work
+    return works, None
+
+def _fetch_openalex_work_single(doi):
+    """_fetch_openalex_work with the same ({doi: work_data}, error) result shape as _fetch_openalex_works_batch"""
+    work_data, error = _fetch_openalex_work(doi)
+    return {doi: work_data} if work_data else {}, error
+
+def fetch_openalex_works(dois, status_text=None):
+    """Fetch OpenAlex work data for many DOIs in batched queries, returns {doi: work_data} (None if not found)"""
+    unique_dois = [doi for doi in dict.fromkeys(dois) if doi and doi != 'N/A']
+    works = dict.fromkeys(unique_dois)
+    if not unique_dois:
+        return works
+
+    # ',' and '|' are filter syntax, the rare DOIs containing them are looked up one by one
+    batchable = [doi for doi in unique_dois if ',' not in doi and '|' not in doi]
+    singles = [doi for doi in unique_dois if ',' in doi or '|' in doi]
+    chunks = [batchable[start:start + OPENALEX_BATCH_SIZE] for start in range(0, len(batchable), OPENALEX_BATCH_SIZE)]
+
+    # Requests are I/O-bound: overlap them in a thread pool, Streamlit calls stay in the main thread
+    with ThreadPoolExecutor(max_workers=OPENALEX_MAX_WORKERS) as executor:
+        futures = [executor.submit(_fetch_openalex_works_batch, chunk) for chunk in chunks]
+        futures += [executor.submit(_fetch_openalex_work_single, doi) for doi in singles]
+        for i, future in enumerate(as_completed(futures)):
+            found, error = future.result()
+            if error:
+                st.warning(error)
+            for doi, work_data in found.items():
+                works[doi] = work_data
+                _citation_roots[doi] = (work_data['id'], work_data.get('cited_by_count', 0))
+            if status_text:
+                status_text.text(f"   ↳ Fetched OpenAlex data: {i + 1}/{len(futures)} batches...")
+
+    return works
+
+# Fields of a citing work used by the analysis, requested via select= so the rest is never sent
+# (host_venue is no longer served by OpenAlex, primary_location replaces it)
+CITING_WORK_FIELDS = ('id', 'doi', 'ids', 'publication_year', 'authorships', 'primary_location')
+
+def _fetch_openalex_page(params):
+    """Fetch one OpenAlex listing page, returns (data, error). Safe to call from worker threads"""
+    try:
+        resp = SESSION.get(OPENALEX_BASE_URL, params=params, timeout=20)
+        if resp.status_code == 200:
+            return _json(resp), None
+        return None, f"status {resp.status_code}"
+    except Exception as e:
+        return None, str(e)
 
-def get_citing_articles_openalex(doi, progress_bar=None, status_text=None):
-    """Get ALL citing DOIs for a given article through OpenAlex - NO LIMITS"""
-    citing_dois = []
+def _fetch_citing_works(doi):
+    """Get ALL citing works (reduced to CITING_WORK_FIELDS) for a given article - NO LIMITS. Returns (works, errors), thread-safe"""
+    citing_works = []
+    errors = []
     
     if doi == 'N/A':
-        return citing_dois
-
-    # Get work data first
-    work_data = get_openalex_work_by_doi(doi)
-    if not work_data:
-        return citing_dois
-
-    cited_by_count = work_data.get('cited_by_count', 0)
-    if status_text:
-        status_text.text(f"    Article has {cited_by_count} citations")
-
-    if cited_by_count > 0:
-        # Get list of ALL citing works with pagination
-        page = 1
-        per_page = 200  # Maximum per page
-        cited_by_url = f"https://api.openalex.org/works?filter=cites:{work_data['id']}&per-page={per_page}"
-        
-        while cited_by_url:
-            try:
-                if status_text:
-                    status_text.text(f"   ↳ Fetching citation page {page}...")
-                response_cited = requests.get(cited_by_url, timeout=20)
-                if response_cited.status_code == 200:
-                    cited_data = response_cited.json()
-                    results = cited_data.get('results', [])
-                    
-                    for work in results:
-                        # Extract DOI from citing work
-                        if work.get('doi'):
-                            citing_doi = work['doi']
-                            if citing_doi.startswith('https://doi.org/'):
-                                citing_doi = citing_doi[16:]
-                            citing_dois.append(citing_doi)
-                        elif work.get('ids', {}).get('doi'):
-                            citing_doi = work['ids']['doi']
-                            if citing_doi.startswith('https://doi.org/'):
-                                citing_doi = citing_doi[16:]
-                            citing_dois.append(citing_doi)
-                    
-                    if status_text:
-                        status_text.text(f"    Page {page}: found {len(results)} citing articles")
-                    
-                    # Update progress
-                    if progress_bar and cited_by_count > 0:
-                        progress = min(page * per_page / cited_by_count, 1.0)
-                        progress_bar.progress(progress)
-                    
-                    # Check for next page
-                    cited_by_url = cited_data.get('meta', {}).get('next_page')
-                    if cited_by_url:
-                        page += 1
-                        time.sleep(0.3)  # Be polite to API
-                    else:
-                        break
-                else:
-                    st.warning(f"    Error fetching citations page {page}: {response_cited.status_code}")
-                    break
-            except Exception as e:
-                st.warning(f"    Error in pagination for {doi}: {e}")
-                break
-
-    if status_text:
-        status_text.text(f"    Total citing articles collected: {len(citing_dois)}")
-    return citing_dois
-
-def get_citing_articles_openalex_with_years(doi, target_citation_year, progress_bar=None, status_text=None):
-    """Get ALL citing DOIs for a given article through OpenAlex с фильтрацией по году цитирования"""
-    citing_articles = []  # Будем хранить DOI и год цитирования
+        return citing_works, errors
+
+    # Only the OpenAlex ID and citation count of the cited work are needed,
+    # the work itself is looked up only if fetch_openalex_works has not seen it yet
+    root = _citation_roots.get(doi)
+    if root is None:
+        work_data, error = _fetch_openalex_work(doi)
+        if error:
+            errors.append(error)
+        if not work_data:
+            return citing_works, errors
+        root = _citation_roots[doi] = (work_data['id'], work_data.get('cited_by_count', 0))
     
-    if doi == 'N/A':
-        return citing_articles
-
-    # Get work data first
-    work_data = get_openalex_work_by_doi(doi)
-    if not work_data:
-        return citing_articles
-
-    cited_by_count = work_data.get('cited_by_count', 0)
-    if status_text:
-        status_text.text(f"    Article has {cited_by_count} citations")
+    work_id, cited_by_count = root
+    if cited_by_count == 0:
+        return citing_works, errors
+
+    def collect(data):
+        # The listing already contains authorships, primary_location, publication_year etc.
+        results = data.get('results', [])
+        # Only citing works with a DOI count as citations (Impact Factor and self-citation totals)
+        citing_works.extend(
+            work for work in results if work.get('doi') or (work.get('ids') or {}).get('doi')
+        )
+        return results
 
-    if cited_by_count > 0:
-        # Get list of ALL citing works with pagination
+    # Get list of ALL citing works with pagination
+    per_page = 200  # Maximum per page
+    params = {'filter': f"cites:{work_id}", 'per-page': per_page, 'select': ','.join(CITING_WORK_FIELDS)}
+    
+    # The first page is requested with cursor=* so it seeds both basic and cursor paging
+    data, error = _fetch_openalex_page({**params, 'cursor': '*'})
+    if error:
+        errors.append(f"Error fetching citations page 1 for {doi}: {error}")
+        return citing_works, errors
+    collect(data)
+    
+    total_count = data.get('meta', {}).get('count', 0)
+    if total_count <= OPENALEX_MAX_PAGED_RESULTS:
+        # Page count is known after the first page: fetch the rest concurrently
+        pages = range(2, math.ceil(total_count / per_page) + 1)
+        with ThreadPoolExecutor(max_workers=OPENALEX_PAGE_WORKERS) as executor:
+            results = executor.map(lambda page: _fetch_openalex_page({**params, 'page': page}), pages)
+            for page, (data, error) in zip(pages, results):
+                if error:
+                    errors.append(f"Error fetching citations page {page} for {doi}: {error}")
+                    continue
+                collect(data)
+    else:
+        # Basic paging stops at 10 000 results, deeper lists continue sequentially from the first cursor
         page = 1
-        per_page = 200  # Maximum per page
-        cited_by_url = f"https://api.openalex.org/works?filter=cites:{work_data['id']}&per-page={per_page}"
-        
-        while cited_by_url:
-            try:
-                if status_text:
-                    status_text.text(f"   ↳ Fetching citation page {page}...")
-                response_cited = requests.get(cited_by_url, timeout=20)
-                if response_cited.status_code == 200:
-                    cited_data = response_cited.json()
-                    results = cited_data.get('results', [])
-                    
-                    for work in results:
-                        # Проверяем год публикации цитирующей статьи
-                        publication_year = work.get('publication_year')
-                        
-                        # Если год цитирования соответствует целевому году
-                        if publication_year == target_citation_year:
-                            # Extract DOI from citing work
-                            citing_doi = None
-                            if work.get('doi'):
-                                citing_doi = work['doi']
-                                if citing_doi.startswith('https://doi.org/'):
-                                    citing_doi = citing_doi[16:]
-                            elif work.get('ids', {}).get('doi'):
-                                citing_doi = work['ids']['doi']
-                                if citing_doi.startswith('https://doi.org/'):
-                                    citing_doi = citing_doi[16:]
-                            
-                            if citing_doi:
-                                citing_articles.append({
-                                    'doi': citing_doi,
-                                    'year': publication_year
-                                })
-                    
-                    if status_text:
-                        status_text.text(f"    Page {page}: found {len(results)} citing articles, {len([a for a in citing_articles if a['year'] == target_citation_year])} for target year {target_citation_year}")
-                    
-                    # Update progress
-                    if progress_bar and cited_by_count > 0:
-                        progress = min(page * per_page / cited_by_count, 1.0)
-                        progress_bar.progress(progress)
-                    
-                    # Check for next page
-                    cited_by_url = cited_data.get('meta', {}).get('next_page')
-                    if cited_by_url:
-                        page += 1
-                        time.sleep(0.3)  # Be polite to API
-                    else:
-                        break
-                else:
-                    st.warning(f"    Error fetching citations page {page}: {response_cited.status_code}")
-                    break
-            except Exception as e:
-                st.warning(f"    Error in pagination for {doi}: {e}")
+        while True:
+            cursor = data.get('meta', {}).get('next_cursor')
+            if not cursor:
+                break
+            page += 1
+            data, error = _fetch_openalex_page({**params, 'cursor': cursor})
+            if error:
+                errors.append(f"Error fetching citations page {page} for {doi}: {error}")
+                break
+            if not collect(data):
                 break
 
-    if status_text:
-        status_text.text(f"    Total citing articles for year {target_citation_year}: {len([a for a in citing_articles if a['year'] == target_citation_year])}")
-    return citing_articles
+    return citing_works, errors
+
+def _fetch_citations(doi, citations_cache=None):
+    """Citing works of a DOI as (works, errors), complete listings are memoized in citations_cache. Thread-safe"""
+    if citations_cache is not None and doi in citations_cache:
+        return citations_cache[doi], ()
+    citing_works, errors = _fetch_citing_works(doi)
+    # Tuples so that callers cannot mutate the shared result
+    citing_works = tuple(citing_works)
+    if citations_cache is not None and not errors:
+        # Incomplete listings are not memoized, the next call fetches them again
+        citations_cache[doi] = citing_works
+    return citing_works, tuple(errors)
+
+def fetch_citations(doi, citations_cache=None):
+    """Single entry point for citing works of a DOI, shared by Impact Factor and citation analysis through citations_cache"""
+    citing_works, errors = _fetch_citations(doi, citations_cache)
+    for error in errors:
+        st.warning(f"    {error}")
+    return citing_works
+
+def prefetch_citations(dois, citations_cache, status_text=None):
+    """Fetch citing works for many DOIs concurrently into citations_cache, later fetch_citations calls are cache hits"""
+    dois = [doi for doi in dict.fromkeys(dois) if doi and doi != 'N/A']
+    # Failed listings are not memoized: fetch_citations retries them later and reports the warnings from the main thread
+    with ThreadPoolExecutor(max_workers=OPENALEX_MAX_WORKERS) as executor:
+        for i, _ in enumerate(executor.map(lambda doi: _fetch_citations(doi, citations_cache), dois)):
+            if status_text and (i + 1) % 10 == 0:
+                status_text.text(f"   ↳ Fetched citing articles for {i + 1}/{len(dois)} articles...")
 
 def extract_author_names(authors_list):
     """Extract author names in 'Surname FirstInitial' format from Crossref"""
@@ -278,64 +434,158 @@ def extract_author_names_openalex(authorships):
                 author_names.append(author['display_name'])
     return author_names
 
+def format_author_names(display_names):
+    """Format OpenAlex display names as 'Surname FirstInitial.' in one vectorized pass (single-word names are skipped)"""
+    name_parts = pd.Series(display_names, dtype=object).str.split()
+    name_parts = name_parts[name_parts.str.len() >= 2]
+    return (name_parts.str[-1] + ' ' + name_parts.str[0].str[0] + '.').tolist()
+
+def normalize_dois(raw_dois):
+    """Strip the doi.org prefix and drop empty and duplicate DOIs in one vectorized pass"""
+    dois = pd.Series(raw_dois, dtype=object).dropna().str.removeprefix(DOI_PREFIX)
+    return dois[dois != ''].drop_duplicates().tolist()
+
 def extract_institutions_crossref(authors_list):
-    """Extract UNIQUE institutions from Crossref authors with affiliation"""
-    institutions = []
+    """Extract institutions from Crossref authors with affiliation (generator, deduplicated by the caller)"""
     for author in authors_list:
-        if author.get('affiliation'):
-            for affiliation in author['affiliation']:
-                if affiliation.get('name'):
-                    institutions.append(affiliation['name'])
-    return list(set(institutions))  # Return unique institutions
+        for affiliation in author.get('affiliation') or []:
+            if affiliation.get('name'):
+                yield affiliation['name']
 
 def extract_institutions_openalex(authorships):
-    """Extract UNIQUE institutions from OpenAlex authorships"""
+    """Extract institutions and countries from OpenAlex authorships (generators, deduplicated by the caller)"""
+    institutions = (
+        institution['display_name']
+        for authorship in authorships
+        for institution in authorship.get('institutions', [])
+        if institution.get('display_name')
+    )
+    # Extract country information
+    countries = (
+        institution.get('country_code') or institution.get('country')
+        for authorship in authorships
+        for institution in authorship.get('institutions', [])
+        if institution.get('country_code') or institution.get('country')
+    )
+    return institutions, countries
+
+def count_references(references):
+    """Count (total, with DOI, without DOI) for a Crossref reference list"""
+    refs_with_doi = sum(1 for ref in references if ref.get('DOI'))
+    return len(references), refs_with_doi, len(references) - refs_with_doi
+
+def _fetch_references_chunk(chunk):
+    """Fetch reference counts for a chunk of DOIs in one Crossref query, returns ({doi: counts}, error). Thread-safe"""
+    # One filter=doi:A,doi:B,... request per chunk instead of one /works/{doi} request per DOI
+    params = {
+        'filter': ','.join(f'doi:{doi}' for doi in chunk),
+        'select': 'DOI,reference',
+        'rows': len(chunk),
+        'mailto': 'example@email.com'
+    }
+    try:
+        items = _fetch_crossref_page(params)['items']
+        # Crossref DOIs are case-insensitive, map results back to the DOIs as they were passed in
+        by_lower = {doi.lower(): doi for doi in chunk}
+        return {
+            by_lower[item['DOI'].lower()]: count_references(item.get('reference', []))
+            for item in items if item.get('DOI', '').lower() in by_lower
+        }, None
+    except Exception as e:
+        return {}, f"Error fetching Crossref references: {e}"
+
+def submit_references_bulk(executor, dois, chunk_size=40):
+    """Submit batched Crossref reference queries to executor, returns one future per chunk of DOIs"""
+    # ~40 DOIs keep the filter URL well under Crossref's length limit; a ',' inside a DOI would split
+    # the filter, such DOIs are left to the OpenAlex fallback in analyze_references_bulk
+    dois = [doi for doi in dois if doi and doi != 'N/A' and ',' not in doi]
+    return [
+        executor.submit(_fetch_references_chunk, dois[start:start + chunk_size])
+        for start in range(0, len(dois), chunk_size)
+    ]
+
+def analyze_references_bulk(dois, openalex_works, chunk_size=40, status_text=None, futures=None):
+    """Analyze references for many DOIs with batched Crossref queries (or collect futures from submit_references_bulk), returns {doi: (total, with DOI, without DOI)}"""
+    refs_by_doi = {}
+    dois = [doi for doi in dois if doi and doi != 'N/A']
+    
+    # Chunks are independent: fetch them concurrently, merge and report in the main thread
+    executor = None
+    if futures is None:
+        executor = ThreadPoolExecutor(max_workers=CROSSREF_MAX_WORKERS)
+        futures = submit_references_bulk(executor, dois, chunk_size)
+    try:
+        for i, future in enumerate(as_completed(futures)):
+            chunk_refs, error = future.result()
+            if error:
+                st.warning(error)
+            refs_by_doi.update(chunk_refs)
+            if status_text:
+                status_text.text(f" Analyzing references... {i + 1}/{len(futures)} batches")
+    finally:
+        if executor:
+            executor.shutdown()
+
+    # Try OpenAlex as fallback for DOIs Crossref did not return
+    for doi in dois:
+        if doi in refs_by_doi:
+            continue
+        work_data = openalex_works.get(doi)
+        if work_data:
+            total_refs = len(work_data.get('referenced_works', []))
+            # In OpenAlex, referenced works typically have IDs
+            refs_by_doi[doi] = (total_refs, total_refs, 0)
+        else:
+            refs_by_doi[doi] = (0, 0, 0)
+
+    return refs_by_doi
+
+def citing_work_details(work_data, details_cache=None):
+    """Extract (journal name, venue ISSNs, author display names, institutions, countries) from a citing work, memoized by OpenAlex ID in details_cache"""
+    work_id = work_data.get('id')
+    details = details_cache.get(work_id) if work_id and details_cache is not None else None
+    if details is not None:
+        return details
+
+    # Citing journal - FIXED: Extract proper journal/venue information
+    # primary_location and source may be null in OpenAlex responses
+    source = (work_data.get('primary_location') or {}).get('source') or {}
+    journal_name = source.get('display_name')
+    
+    # ISSNs of the source
+    venue_issns = source.get('issn') or []
+    if isinstance(venue_issns, str):
+        venue_issns = [venue_issns]
+    
+    author_names = []
     institutions = []
     countries = []
-    for authorship in authorships:
-        for institution in authorship.get('institutions', []):
+    for authorship in work_data.get('authorships') or []:
+        author = authorship.get('author') or {}
+        if author and author.get('display_name'):
+            author_names.append(author['display_name'])
+        
+        # Institutions and countries - COUNT UNIQUE per authorship
+        authorship_institutions = set()
+        authorship_countries = set()
+        for institution in authorship.get('institutions') or []:
             if institution.get('display_name'):
-                institutions.append(institution['display_name'])
-            # Extract country information
+                authorship_institutions.add(institution['display_name'])
+            # FIXED: Extract country information properly
             if institution.get('country_code'):
-                countries.append(institution['country_code'])
+                authorship_countries.add(institution['country_code'])
             elif institution.get('country'):
-                countries.append(institution['country'])
-    return list(set(institutions)), list(set(countries))  # Return unique institutions and countries
-
-def analyze_references(doi):
-    """Analyze references for a given DOI"""
-    if doi == 'N/A':
-        return 0, 0, 0
+                authorship_countries.add(institution['country'])
+        institutions.extend(authorship_institutions)
+        countries.extend(authorship_countries)
     
-    refs_with_doi = 0
-    refs_without_doi = 0
-    total_refs = 0
+    details = (journal_name, tuple(venue_issns), tuple(author_names), tuple(institutions), tuple(countries))
+    if work_id and details_cache is not None:
+        details_cache[work_id] = details
+    return details
 
-    try:
-        url = f"{CROSSREF_BASE_URL}/{doi}"
-        resp = requests.get(url)
-        if resp.status_code == 200:
-            data = resp.json()
-            references = data['message'].get('reference', [])
-            total_refs = len(references)
-            for ref in references:
-                if ref.get('DOI'):
-                    refs_with_doi += 1
-                else:
-                    refs_without_doi += 1
-    except:
-        # Try OpenAlex as fallback
-        work_data = get_openalex_work_by_doi(doi)
-        if work_data:
-            references = work_data.get('referenced_works', [])
-            total_refs = len(references)
-            refs_with_doi = total_refs  # In OpenAlex, referenced works typically have IDs
-            refs_without_doi = 0
-
-    return total_refs, refs_with_doi, refs_without_doi
-
-def get_citation_analysis_enhanced(doi, target_issn, target_journal_name=None, progress_bar=None, status_text=None):
+def get_citation_analysis_enhanced(doi, target_issn, target_journal_name=None, status_text=None, work_data=None,
+                                   details_cache=None, citations_cache=None):
     """Enhanced citation analysis using OpenAlex citing articles - ANALYZES ALL CITATIONS"""
     citing_authors = []
     citing_journals = []
@@ -343,99 +593,58 @@ def get_citation_analysis_enhanced(doi, target_issn, target_journal_name=None, p
     citing_countries = []
     self_citation_count = 0
     
-    citing_dois = get_citing_articles_openalex(doi, progress_bar, status_text)
+    # Uncited articles (the long tail) need no citation listing at all
+    if work_data is not None and work_data.get('cited_by_count', 0) == 0:
+        return citing_authors, citing_journals, citing_institutions, citing_countries, self_citation_count
+    
+    if status_text:
+        status_text.text(f"   ↳ Fetching citing articles for {doi}...")
+    citing_works = fetch_citations(doi, citations_cache)
 
-    if not citing_dois:
+    if not citing_works:
         return citing_authors, citing_journals, citing_institutions, citing_countries, self_citation_count
 
     if status_text:
-        status_text.text(f"    Analyzing ALL {len(citing_dois)} citing articles...")
+        status_text.text(f"    Analyzing ALL {len(citing_works)} citing articles...")
+
+    # Self-citation targets are normalized once, not per citing work
+    target_issns = frozenset({target_issn, target_issn.replace('-', '')}) if target_issn else frozenset()
 
     # Analyze ALL citing articles - NO LIMITS
-    for i, citing_doi in enumerate(citing_dois):
-        try:
-            # Get citing article details from OpenAlex
-            work_data = get_openalex_work_by_doi(citing_doi)
-            if work_data:
-                # Citing journal - FIXED: Extract proper journal/venue information
-                source = work_data.get('primary_location', {}).get('source', {})
-                host_venue = work_data.get('host_venue', {})
-                
-                journal_name = None
-                # Try multiple sources for journal name
-                if source and source.get('display_name'):
-                    journal_name = source['display_name']
-                elif host_venue and host_venue.get('display_name'):
-                    journal_name = host_venue['display_name']
-                elif work_data.get('primary_location', {}).get('source', {}).get('display_name'):
-                    journal_name = work_data['primary_location']['source']['display_name']
-                
-                if journal_name:
-                    citing_journals.append(journal_name)
-                    
-                    # IMPROVED SELF-CITATION DETECTION
-                    # Check for self-citation by ISSN or journal name similarity
-                    is_self_citation = False
-                    
-                    # Method 1: Check by ISSN in host_venue
-                    if host_venue and host_venue.get('issn'):
-                        venue_issns = host_venue['issn']
-                        if isinstance(venue_issns, str):
-                            venue_issns = [venue_issns]
-                        if target_issn in venue_issns:
-                            is_self_citation = True
-                    
-                    # Method 2: Check by journal name similarity (fallback)
-                    if not is_self_citation and target_journal_name and target_journal_name.lower() in journal_name.lower():
-                        is_self_citation = True
-                    
-                    if is_self_citation:
-                        self_citation_count += 1
-                        if status_text:
-                            status_text.text(f"    Self-citation detected: {journal_name}")
-                
-                # Citing authors and institutions
-                authorships = work_data.get('authorships', [])
-                for authorship in authorships:
-                    author = authorship.get('author', {})
-                    if author and author.get('display_name'):
-                        name_parts = author['display_name'].split()
-                        if len(name_parts) >= 2:
-                            surname = name_parts[-1]
-                            first_initial = name_parts[0][0] if name_parts[0] else ''
-                            citing_authors.append(f"{surname} {first_initial}.")
-                    
-                    # Institutions and countries - COUNT UNIQUE per article
-                    article_institutions = set()
-                    article_countries = set()
-                    for institution in authorship.get('institutions', []):
-                        if institution.get('display_name'):
-                            article_institutions.add(institution['display_name'])
-                        # FIXED: Extract country information properly
-                        if institution.get('country_code'):
-                            article_countries.add(institution['country_code'])
-                        elif institution.get('country'):
-                            article_countries.add(institution['country'])
-                    
-                    citing_institutions.extend(list(article_institutions))
-                    citing_countries.extend(list(article_countries))
-                
-                # Progress update for large citation sets
-                if status_text and (i + 1) % 50 == 0:
-                    status_text.text(f"   ↳ Processed {i + 1}/{len(citing_dois)} citing articles...")
-                
-                time.sleep(0.1)  # Be polite to API
-                
-        except Exception as e:
-            st.warning(f"    Error analyzing citing article {citing_doi}: {e}")
-            continue
+    # Citing work details come straight from the citation listing, no extra request per work.
+    # One projection pass turns the list of work dicts into parallel columns, the rest works on columns
+    details = [citing_work_details(work_data, details_cache) for work_data in citing_works if work_data]
+    if not details:
+        return citing_authors, citing_journals, citing_institutions, citing_countries, self_citation_count
+    journal_names, venue_issns, author_names, institutions, countries = zip(*details)
+
+    citing_journals = [journal_name for journal_name in journal_names if journal_name]
+    citing_institutions = list(chain.from_iterable(institutions))
+    citing_countries = list(chain.from_iterable(countries))
+
+    # IMPROVED SELF-CITATION DETECTION (only works with a known journal are counted)
+    # Method 1: Check by ISSN of the source, Method 2: journal name similarity (fallback),
+    # the name test is a case-insensitive substring match run by Arrow's string kernel over the whole column
+    journal_series = pd.Series(journal_names, dtype='string[pyarrow]')
+    has_journal = journal_series.str.len().fillna(0).to_numpy() > 0
+    self_cite_mask = np.fromiter(
+        (not target_issns.isdisjoint(issns) for issns in venue_issns), dtype=bool, count=len(venue_issns)
+    )
+    if target_journal_name:
+        self_cite_mask |= journal_series.str.contains(
+            target_journal_name, case=False, regex=False
+        ).fillna(False).to_numpy(dtype=bool)
+    self_citation_count = int(np.count_nonzero(self_cite_mask & has_journal))
+
+    # Citing authors are formatted in one vectorized pass
+    citing_authors = format_author_names(list(chain.from_iterable(author_names)))
 
     if status_text:
-        status_text.text(f"    Completed analysis of {len(citing_dois)} citing articles")
+        status_text.text(f"    Completed analysis of {len(citing_works)} citing articles")
         status_text.text(f"    Self-citations found: {self_citation_count}")
     return citing_authors, citing_journals, citing_institutions, citing_countries, self_citation_count
 
-def calculate_journal_impact_factor(issn, citation_year, publication_years, status_text, progress_bar):
+def calculate_journal_impact_factor(issn, citation_year, publication_years, status_text, progress_bar, citations_cache=None):
     """Расчет импакт-фактора журнала как часть общего анализа"""
     
     status_text.text(f" Calculating Impact Factor for {citation_year}...")
@@ -470,36 +679,41 @@ def calculate_journal_impact_factor(issn, citation_year, publication_years, stat
         if doi:
             publication_dois.append(doi)
     
-    # Подсчитываем цитирования за целевой год
-    total_citations = 0
-    citation_details = []
+    # Подсчитываем цитирования за целевой год (колоночный массив вместо списка словарей)
+    citations_per_article = np.zeros(len(publication_dois), dtype=np.int64)
     
     if_progress_bar = st.progress(0)
     if_status_text = st.empty()
     
+    # Работы загружаются пакетами, чтобы списки цитирований не искали каждую статью отдельно
+    if_status_text.text(f" Impact Factor: Fetching OpenAlex data for {len(publication_dois)} articles...")
+    fetch_openalex_works(publication_dois, if_status_text)
+    
+    # Загружаем цитирующие работы для всех статей параллельно
+    if_status_text.text(f" Impact Factor: Fetching citations for {len(publication_dois)} articles...")
+    prefetch_citations(publication_dois, citations_cache, if_status_text)
+    
     for i, doi in enumerate(publication_dois):
         if_status_text.text(f" Impact Factor: Analyzing citations for article {i+1}/{len(publication_dois)}...")
         
-        citing_articles = get_citing_articles_openalex_with_years(doi, citation_year, if_progress_bar, if_status_text)
+        # Те же цитирующие работы используются и в основном анализе
+        citing_works = fetch_citations(doi, citations_cache)
         
         # Считаем только цитирования за целевой год
-        citations_for_article = len([a for a in citing_articles if a['year'] == citation_year])
-        total_citations += citations_for_article
-        
-        citation_details.append({
-            'DOI': doi,
-            'Citations': citations_for_article
-        })
+        citing_years = np.fromiter(
+            (w.get('publication_year') or 0 for w in citing_works), dtype=np.int32, count=len(citing_works)
+        )
+        citations_per_article[i] = np.count_nonzero(citing_years == citation_year)
         
         # Обновляем прогресс
         progress = (i + 1) / len(publication_dois)
         if_progress_bar.progress(progress)
-        
-        time.sleep(0.2)  # Быть вежливым к API
     
     if_progress_bar.empty()
     if_status_text.empty()
     
+    total_citations = int(citations_per_article.sum())
+    
     # Рассчитываем импакт-фактор
     if len(publication_articles) > 0:
         impact_factor = total_citations / len(publication_articles)
@@ -536,6 +750,11 @@ def main():
         3. Click 'Start Analysis' button
         4. Wait for comprehensive results including Impact Factor
         """)
+        
+        if st.button("Clear API cache"):
+            SESSION.cache.clear()
+            st.success("API cache cleared")
+        st.caption(f"Cached API responses: {len(SESSION.cache.responses)}")
 
     # Main analysis
     if st.button(" Start Comprehensive Analysis", type="primary"):
@@ -543,12 +762,14 @@ def main():
             st.error("Please enter an ISSN")
             return
         
-        # Initialize session state for results
-        if 'analysis_results' not in st.session_state:
-            st.session_state.analysis_results = {}
+        # Results of a previous analysis must not be shown for this one
+        st.session_state.pop('analysis_results', None)
         
         with st.spinner(" Starting comprehensive journal analysis..."):
             get_articles_analysis(issn, period)
+    elif st.session_state.get('analysis_results'):
+        # Any other widget (e.g. a download button) reruns the script: show the stored results, no recomputation
+        display_results(*st.session_state.analysis_results)
 
 def get_articles_analysis(issn, period):
     """Main analysis function adapted for Streamlit"""
@@ -579,6 +800,10 @@ def get_articles_analysis(issn, period):
     progress_bar = st.progress(0)
     status_text = st.empty()
 
+    # DOI -> citing works for this run, shared by the Impact Factor and the citation analysis
+    # (a dict holding every listing of the run, not an LRU that in-order walks over many DOIs would thrash)
+    citations_cache = {}
+
     # Расчет импакт-фактора в начале анализа
     status_text.text(" Determining Impact Factor calculation parameters...")
     citation_year, publication_years = calculate_impact_factor_years()
@@ -587,7 +812,7 @@ def get_articles_analysis(issn, period):
     # Вычисляем импакт-фактор только если период анализа включает нужные годы
     if any(year in years_range for year in publication_years + [citation_year]):
         impact_factor, total_citations, citable_items = calculate_journal_impact_factor(
-            issn, citation_year, publication_years, status_text, progress_bar
+            issn, citation_year, publication_years, status_text, progress_bar, citations_cache
         )
         if impact_factor is not None:
             impact_factor_data = {
@@ -621,112 +846,130 @@ def get_articles_analysis(issn, period):
             st.info(f" Target journal: {target_journal_name}")
 
     # Extract DOI list from Crossref results
-    dois = []
-    for item in crossref_items:
-        doi = item.get('DOI')
-        if doi:
-            dois.append(doi)
+    dois = normalize_dois([item.get('DOI') for item in crossref_items])
 
     status_text.text(f" Extracted {len(dois)} unique DOIs for analysis")
     progress_bar.progress(0.1)
 
     # Process data
-    all_authors = []
-    all_institutions = []
-    all_countries = []
+    # Per-article rows, flattened and deduplicated once at aggregation time
+    article_authors = []
+    institution_rows = []  # (article, source, institution)
+    country_rows = []  # (article, country)
     self_citations_by_year = {year: {'total_citations': 0, 'self_citations': 0} for year in years_range}
-    reference_stats = []
-    all_citing_authors = []
-    all_citing_journals = []
-    all_citing_institutions = []
-    all_citing_countries = []
+    # Citing data is tallied per article, no full lists are kept
+    citing_authors_counter = Counter()
+    citing_journals_counter = Counter()
+    citing_institutions_counter = Counter()
+    citing_countries_counter = Counter()
+    # OpenAlex ID -> citing work details for this run; works citing several analyzed articles are parsed once
+    citing_details_cache = {}
 
     # Process authors and institutions from Crossref
     status_text.text(" Processing author and institution data from Crossref...")
 
-    articles_with_institutions = 0
-    total_institutions_count = 0
-
     for i, item in enumerate(crossref_items):
         # Authors
         authors = item.get('author', [])
-        author_names = extract_author_names(authors)
-        all_authors.extend(author_names)
+        article_authors.append(extract_author_names(authors))
         
-        # Institutions - COUNT UNIQUE PER ARTICLE
-        article_institutions = extract_institutions_crossref(authors)
-        if article_institutions:
-            articles_with_institutions += 1
-            total_institutions_count += len(article_institutions)
-            all_institutions.extend(article_institutions)
+        # Institutions - COUNT UNIQUE PER ARTICLE (deduplicated below)
+        article_id = item.get('DOI') or i
+        institution_rows.extend(
+            (article_id, 'crossref', institution) for institution in extract_institutions_crossref(authors)
+        )
 
     progress_bar.progress(0.3)
 
     # Enhanced analysis for ALL articles
     status_text.text(f" Starting enhanced OpenAlex analysis for ALL {len(dois)} articles...")
 
-    openalex_institutions_count = 0
-    openalex_countries_count = 0
+    # Crossref publication year by DOI (first record wins), fallback when OpenAlex has no year
+    doi_to_year = {}
+    for item in crossref_items:
+        if item.get('DOI') and item['DOI'] not in doi_to_year:
+            date_parts = item.get('published', {}).get('date-parts', [])
+            doi_to_year[item['DOI']] = date_parts[0][0] if date_parts and date_parts[0] else None
 
-    for i, doi in enumerate(dois):
-        status_text.text(f" Analyzing article {i+1}/{len(dois)}: {doi[:50]}...")
+    # Crossref reference batches run on their own pool while the OpenAlex stages below proceed,
+    # so both APIs are queried in the same pass over the DOIs
+    references_executor = ThreadPoolExecutor(max_workers=CROSSREF_MAX_WORKERS)
+    try:
+        reference_futures = submit_references_bulk(references_executor, dois)
+
+        # Fetch OpenAlex data for all DOIs concurrently instead of one by one
+        status_text.text(f" Fetching OpenAlex data for {len(dois)} articles...")
+        openalex_works = fetch_openalex_works(dois, status_text)
+
+        # Fetch citing works of all articles in the analysis period concurrently, the loop below reads them from cache
+        citation_dois = [
+            doi for doi, work_data in openalex_works.items()
+            if work_data and work_data.get('cited_by_count', 0) > 0
+            and (work_data.get('publication_year') or doi_to_year.get(doi)) in years_range
+        ]
+        status_text.text(f" Fetching citing articles for {len(citation_dois)} articles...")
+        prefetch_citations(citation_dois, citations_cache, status_text)
+
+        # Progress widgets are refreshed about 100 times per run at most
+        progress_step = max(1, len(dois) // 100)
+        for i, doi in enumerate(dois):
+            if i % progress_step == 0:
+                status_text.text(f" Analyzing article {i+1}/{len(dois)}: {doi[:50]}...")
         
-        # Get OpenAlex data for this DOI
-        work_data = get_openalex_work_by_doi(doi)
+            # Get OpenAlex data for this DOI
+            work_data = openalex_works.get(doi)
         
-        if work_data:
-            # Extract institutions and countries from OpenAlex
-            authorships = work_data.get('authorships', [])
-            article_institutions_openalex, article_countries_openalex = extract_institutions_openalex(authorships)
-            if article_institutions_openalex:
-                openalex_institutions_count += len(article_institutions_openalex)
-                all_institutions.extend(article_institutions_openalex)
-            if article_countries_openalex:
-                openalex_countries_count += len(article_countries_openalex)
-                all_countries.extend(article_countries_openalex)
+            if work_data:
+                # Extract institutions and countries from OpenAlex
+                authorships = work_data.get('authorships', [])
+                article_institutions_openalex, article_countries_openalex = extract_institutions_openalex(authorships)
+                institution_rows.extend((doi, 'openalex', institution) for institution in article_institutions_openalex)
+                country_rows.extend((doi, country) for country in article_countries_openalex)
             
-            # Get publication year
-            publication_year = work_data.get('publication_year')
-            if not publication_year:
-                for item in crossref_items:
-                    if item.get('DOI') == doi:
-                        date_parts = item.get('published', {}).get('date-parts', [])
-                        if date_parts and date_parts[0]:
-                            publication_year = date_parts[0][0]
-                        break
+                # Get publication year
+                publication_year = work_data.get('publication_year') or doi_to_year.get(doi)
             
-            # Enhanced citation analysis
-            if publication_year and publication_year in years_range:
-                article_progress = st.empty()
-                citing_authors, citing_journals, citing_institutions, citing_countries, self_citations = get_citation_analysis_enhanced(
-                    doi, issn, target_journal_name, progress_bar, article_progress
-                )
+                # Enhanced citation analysis
+                if publication_year and publication_year in years_range:
+                    # Like the status line, the per-article progress is shown only on refresh iterations
+                    article_progress = st.empty() if i % progress_step == 0 else None
+                    citing_authors, citing_journals, citing_institutions, citing_countries, self_citations = get_citation_analysis_enhanced(
+                        doi, issn, target_journal_name, article_progress, work_data, citing_details_cache, citations_cache
+                    )
                 
-                total_citations_for_article = len(citing_journals)
-                self_citations_by_year[publication_year]['total_citations'] += total_citations_for_article
-                self_citations_by_year[publication_year]['self_citations'] += self_citations
+                    total_citations_for_article = len(citing_journals)
+                    self_citations_by_year[publication_year]['total_citations'] += total_citations_for_article
+                    self_citations_by_year[publication_year]['self_citations'] += self_citations
                 
-                all_citing_authors.extend(citing_authors)
-                all_citing_journals.extend(citing_journals)
-                all_citing_institutions.extend(citing_institutions)
-                all_citing_countries.extend(citing_countries)
-                article_progress.empty()
+                    citing_authors_counter.update(citing_authors)
+                    citing_journals_counter.update(citing_journals)
+                    citing_institutions_counter.update(citing_institutions)
+                    citing_countries_counter.update(citing_countries)
+                    if article_progress:
+                        article_progress.empty()
         
-        # Update overall progress
-        progress = 0.3 + (i / len(dois)) * 0.4
-        progress_bar.progress(progress)
-        time.sleep(0.5)
-
-    # Reference analysis
-    status_text.text(" Analyzing references...")
-    for i, doi in enumerate(dois):
-        total_refs, refs_with_doi, refs_without_doi = analyze_references(doi)
-        reference_stats.append({
-            'DOI': doi,
-            'Total References': total_refs,
-            'References with DOI': refs_with_doi,
-            'References without DOI': refs_without_doi
-        })
+            # Update overall progress
+            if i % progress_step == 0:
+                progress = 0.3 + (i / len(dois)) * 0.4
+                progress_bar.progress(progress)
+
+        # Reference analysis
+        status_text.text(" Analyzing references...")
+        refs_by_doi = analyze_references_bulk(dois, openalex_works, status_text=status_text, futures=reference_futures)
+    finally:
+        # Also on errors and Streamlit stops: queued Crossref batches are cancelled, not left running
+        references_executor.shutdown(cancel_futures=True)
+    # Only the summary needs reference counts, so running sums replace a per-DOI table
+    refs_articles = 0
+    refs_total_sum = 0
+    refs_with_doi_sum = 0
+    refs_without_doi_sum = 0
+    for doi in dois:
+        total_refs, refs_with_doi, refs_without_doi = refs_by_doi[doi]
+        refs_articles += 1
+        refs_total_sum += total_refs
+        refs_with_doi_sum += refs_with_doi
+        refs_without_doi_sum += refs_without_doi
 
     progress_bar.progress(0.9)
 
@@ -734,46 +977,49 @@ def get_articles_analysis(issn, period):
     status_text.text(" Generating analysis reports...")
 
     # 1. Author Frequency
-    author_freq = Counter(all_authors)
-    author_freq_df = pd.DataFrame(author_freq.most_common(50), columns=['Author', 'Frequency'])
-
-    # 2. Institution Frequency
-    institution_freq = Counter(all_institutions)
-    institution_freq_df = pd.DataFrame(institution_freq.most_common(50), columns=['Institution', 'Frequency'])
-
-    # 3. Self-citation analysis
-    self_citation_data = []
-    total_self_citations = 0
-    total_all_citations = 0
+    author_freq = pd.Series(list(chain.from_iterable(article_authors)), dtype='string[pyarrow]').value_counts()
+    # Arrow-backed columns (pyarrow ships with streamlit) keep strings as contiguous buffers
+    # Counts are downcast to the smallest unsigned integer type that holds them
+    author_freq_df = pd.to_numeric(author_freq.head(50), downcast='unsigned').rename_axis('Author').reset_index(name='Frequency').convert_dtypes(dtype_backend='pyarrow')
+
+    # 2. Institution Frequency - institutions and countries are counted once per article and source
+    institutions_df = pd.DataFrame(
+        institution_rows, columns=['Article', 'Source', 'Institution'], dtype='string[pyarrow]'
+    ).drop_duplicates()
+    institution_freq = institutions_df['Institution'].value_counts()
+    institution_freq_df = pd.to_numeric(institution_freq.head(50), downcast='unsigned').rename_axis('Institution').reset_index(name='Frequency').convert_dtypes(dtype_backend='pyarrow')
+    
+    crossref_institutions_per_article = institutions_df.loc[institutions_df['Source'] == 'crossref', 'Article'].value_counts()
+    articles_with_institutions = len(crossref_institutions_per_article)
+    total_institutions_count = int(crossref_institutions_per_article.sum())
+    
+    countries_df = pd.DataFrame(country_rows, columns=['Article', 'Country'], dtype='string[pyarrow]').drop_duplicates()
+    country_freq = countries_df['Country'].value_counts()
 
-    for year, stats in self_citations_by_year.items():
-        total_citations = stats['total_citations']
-        self_citations = stats['self_citations']
-        
-        if total_citations > 0:
-            self_citation_rate = (self_citations / total_citations) * 100
-        else:
-            self_citation_rate = 0
-            
-        self_citation_data.append({
-            'Year': year,
-            'Total Citations': total_citations,
-            'Self Citations': self_citations,
-            'Self Citation Rate (%)': round(self_citation_rate, 2)
-        })
-        
-        total_self_citations += self_citations
-        total_all_citations += total_citations
+    # 3. Self-citation analysis (vectorized over years)
+    years = np.fromiter(self_citations_by_year.keys(), dtype=np.int32, count=len(self_citations_by_year))
+    total_citations = np.fromiter(
+        (stats['total_citations'] for stats in self_citations_by_year.values()), dtype=np.int64, count=len(years)
+    )
+    self_citations = np.fromiter(
+        (stats['self_citations'] for stats in self_citations_by_year.values()), dtype=np.int64, count=len(years)
+    )
+    self_citation_rate = np.where(total_citations > 0, self_citations * 100.0 / np.maximum(total_citations, 1), 0.0)
 
-    self_citation_df = pd.DataFrame(self_citation_data)
+    self_citation_df = pd.DataFrame({
+        'Year': years,
+        'Total Citations': total_citations,
+        'Self Citations': self_citations,
+        'Self Citation Rate (%)': self_citation_rate
+    })
+    total_self_citations = int(self_citations.sum())
+    total_all_citations = int(total_citations.sum())
 
     # 4. Reference analysis summary
-    if reference_stats:
-        ref_df = pd.DataFrame(reference_stats)
-        total_refs_sum = ref_df['Total References'].sum()
-        if total_refs_sum > 0:
-            with_doi_pct = (ref_df['References with DOI'].sum() / total_refs_sum) * 100
-            without_doi_pct = (ref_df['References without DOI'].sum() / total_refs_sum) * 100
+    if refs_articles:
+        if refs_total_sum > 0:
+            with_doi_pct = (refs_with_doi_sum / refs_total_sum) * 100
+            without_doi_pct = (refs_without_doi_sum / refs_total_sum) * 100
         else:
             with_doi_pct = 0
             without_doi_pct = 0
@@ -781,61 +1027,119 @@ def get_articles_analysis(issn, period):
         reference_analysis_df = pd.DataFrame({
             'Metric': ['Articles Analyzed', 'Total References', 'Average References per Article', 
                       'References with DOI (%)', 'References without DOI (%)'],
-            'Value': [
-                len(ref_df),
-                total_refs_sum,
-                round(ref_df['Total References'].mean(), 2) if len(ref_df) > 0 else 0,
-                round(with_doi_pct, 2),
-                round(without_doi_pct, 2)
-            ]
+            # object dtype keeps the counts as ints next to the float averages and percentages
+            'Value': pd.Series([
+                refs_articles,
+                refs_total_sum,
+                refs_total_sum / refs_articles,
+                with_doi_pct,
+                without_doi_pct
+            ], dtype=object)
         })
     else:
         reference_analysis_df = pd.DataFrame({'Metric': ['No data available'], 'Value': [0]})
 
     # 5. Enhanced citation analysis
-    citing_author_freq = Counter(all_citing_authors).most_common(20) if all_citing_authors else []
-    citing_journal_freq = Counter(all_citing_journals).most_common(20) if all_citing_journals else []
-    citing_institution_freq = Counter(all_citing_institutions).most_common(20) if all_citing_institutions else []
-    citing_country_freq = Counter(all_citing_countries).most_common(20) if all_citing_countries else []
-
-    max_len = max(
-        len(citing_author_freq) if citing_author_freq else 0, 
-        len(citing_journal_freq) if citing_journal_freq else 0, 
-        len(citing_institution_freq) if citing_institution_freq else 0, 
-        len(citing_country_freq) if citing_country_freq else 0,
-        1
-    )
-
-    citing_authors_padded = [f"{author} ({count})" for author, count in citing_author_freq] + [''] * (max_len - len(citing_author_freq))
-    citing_journals_padded = [f"{journal} ({count})" for journal, count in citing_journal_freq] + [''] * (max_len - len(citing_journal_freq))
-    citing_institutions_padded = [f"{inst} ({count})" for inst, count in citing_institution_freq] + [''] * (max_len - len(citing_institution_freq))
-    citing_countries_padded = [f"{country} ({count})" for country, count in citing_country_freq] + [''] * (max_len - len(citing_country_freq))
-
-    citation_analysis_df = pd.DataFrame({
-        'Top Citing Authors': citing_authors_padded,
-        'Top Citing Journals': citing_journals_padded,
-        'Top Citing Institutions': citing_institutions_padded,
-        'Top Citing Countries': citing_countries_padded
-    })
+    citing_author_freq = citing_authors_counter.most_common(20)
+    citing_journal_freq = citing_journals_counter.most_common(20)
+    citing_institution_freq = citing_institutions_counter.most_common(20)
+    citing_country_freq = citing_countries_counter.most_common(20)
+
+    # pd.concat aligns the columns on their index, shorter columns are padded with ''
+    citation_analysis_df = pd.concat([
+        pd.Series([f"{author} ({count})" for author, count in citing_author_freq], name='Top Citing Authors', dtype=object),
+        pd.Series([f"{journal} ({count})" for journal, count in citing_journal_freq], name='Top Citing Journals', dtype=object),
+        pd.Series([f"{inst} ({count})" for inst, count in citing_institution_freq], name='Top Citing Institutions', dtype=object),
+        pd.Series([f"{country} ({count})" for country, count in citing_country_freq], name='Top Citing Countries', dtype=object)
+    ], axis=1).fillna('').convert_dtypes(dtype_backend='pyarrow')
+
+    # Everything the Citation Network section shows, computed once: the top 10 lists are prefixes of the top 20
+    # (most_common sorts stably), and the Counters themselves are not kept for reruns
+    citation_summary = {
+        'total_authors': sum(citing_authors_counter.values()),
+        'total_citations': sum(citing_journals_counter.values()),
+        'unique_journals': len(citing_journals_counter),
+        'unique_institutions': len(citing_institutions_counter),
+        'unique_countries': len(citing_countries_counter),
+        'top_journals': citing_journal_freq[:10],
+        'top_countries': citing_country_freq[:10],
+        'top_authors': citing_author_freq[:10]
+    }
 
     progress_bar.progress(1.0)
     status_text.empty()
 
     # Display results
-    display_results(
+    analysis_results = (
         author_freq_df, institution_freq_df, self_citation_df, 
-        reference_analysis_df, citation_analysis_df, all_countries,
-        crossref_items, articles_with_institutions, total_institutions_count,
-        author_freq, institution_freq, all_citing_authors, all_citing_journals,
-        all_citing_institutions, all_citing_countries, total_self_citations, total_all_citations,
+        reference_analysis_df, citation_analysis_df, country_freq,
+        len(crossref_items), articles_with_institutions, total_institutions_count,
+        len(author_freq), len(institution_freq), citation_summary, total_self_citations, total_all_citations,
         impact_factor_data
     )
+    # Kept for reruns, see main(); only counts of the raw items/frequencies are needed there
+    st.session_state.analysis_results = analysis_results
+    display_results(*analysis_results)
+
+@st.cache_data(show_spinner=False)
+def df_to_csv(df):
+    """Encode a DataFrame as UTF-8 CSV bytes, cached so reruns do not re-serialize unchanged data"""
+    # Arrow's C++ CSV writer, the pandas writer remains the fallback for columns Arrow cannot convert
+    try:
+        sink = io.BytesIO()
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), sink)
+        return sink.getvalue()
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(show_spinner=False)
+def df_to_arrow(df):
+    """Convert a DataFrame to a pyarrow Table for st.dataframe, cached so reruns skip the pandas -> Arrow conversion"""
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+@st.cache_data(show_spinner=False)
+def df_to_parquet(df):
+    """Encode a DataFrame as zstd-compressed Parquet bytes (typed, several times smaller than CSV), cached across reruns"""
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, engine='pyarrow', compression='zstd', index=False)
+    return buffer.getvalue()
+
+def top_counts_chart(counts, label, color='#1f77b4'):
+    """Altair bar chart of (name, count) pairs that keeps the bars in descending count order (st.bar_chart sorts by name)"""
+    chart_df = pd.DataFrame(counts, columns=[label, 'Citation Count'])
+    return alt.Chart(chart_df).mark_bar(color=color).encode(
+        x=alt.X(field=label, type='nominal', sort='-y'),
+        y=alt.Y(field='Citation Count', type='quantitative')
+    )
+
+@st.fragment
+def render_downloads(datasets):
+    """Render CSV/Parquet download buttons; as a fragment, a click reruns only this function, not the whole report"""
+    for filename, dataframe in datasets.items():
+        if not dataframe.empty and len(dataframe) > 0:
+            parquet_filename = filename.replace('.csv', '.parquet')
+            csv_col, parquet_col = st.columns(2)
+            with csv_col:
+                st.download_button(
+                    label=f" Download {filename}",
+                    data=df_to_csv(dataframe),
+                    file_name=filename,
+                    mime="text/csv",
+                    key=filename
+                )
+            with parquet_col:
+                st.download_button(
+                    label=f" Download {parquet_filename}",
+                    data=df_to_parquet(dataframe),
+                    file_name=parquet_filename,
+                    mime="application/vnd.apache.parquet",
+                    key=parquet_filename
+                )
 
 def display_results(author_freq_df, institution_freq_df, self_citation_df, 
-                   reference_analysis_df, citation_analysis_df, all_countries,
-                   crossref_items, articles_with_institutions, total_institutions_count,
-                   author_freq, institution_freq, all_citing_authors, all_citing_journals,
-                   all_citing_institutions, all_citing_countries, total_self_citations, total_all_citations,
+                   reference_analysis_df, citation_analysis_df, country_freq,
+                   articles_count, articles_with_institutions, total_institutions_count,
+                   authors_count, institutions_count, citation_summary, total_self_citations, total_all_citations,
                    impact_factor_data=None):
     """Display comprehensive results in Streamlit"""
     
@@ -865,9 +1169,9 @@ def display_results(author_freq_df, institution_freq_df, self_citation_df,
         st.dataframe(author_freq_df.head(20), use_container_width=True)
 
     with col2:
-        st.metric("Total Authors", len(author_freq))
-        st.metric("Articles Analyzed", len(crossref_items))
-        st.metric("Author Mentions", len(author_freq))
+        st.metric("Total Authors", authors_count)
+        st.metric("Articles Analyzed", articles_count)
+        st.metric("Author Mentions", authors_count)
 
     # 2. Institution Frequency
     st.header(" Institution Frequency Analysis")
@@ -877,72 +1181,63 @@ def display_results(author_freq_df, institution_freq_df, self_citation_df,
         st.dataframe(institution_freq_df.head(20), use_container_width=True)
 
     with col2:
-        st.metric("Total Institutions", len(institution_freq))
+        st.metric("Total Institutions", institutions_count)
         st.metric("Articles with Institution Data", articles_with_institutions)
         st.metric("Avg Institutions per Article", 
-                 f"{total_institutions_count/len(crossref_items):.1f}" if len(crossref_items) > 0 else "N/A")
+                 f"{total_institutions_count/articles_count:.1f}" if articles_count > 0 else "N/A")
 
     # 3. Country Analysis
-    if all_countries:
-        country_freq = Counter(all_countries)
-        country_df = pd.DataFrame(country_freq.most_common(20), columns=['Country', 'Frequency'])
+    if not country_freq.empty:
+        country_df = country_freq.head(20).rename_axis('Country').reset_index(name='Frequency')
         st.header(" Country Distribution Analysis")
         st.dataframe(country_df.head(20), use_container_width=True)
 
     # 4. Self-citation Analysis
     st.header(" Self-Citation Analysis")
-    if not self_citation_df.empty and self_citation_df['Total Citations'].sum() > 0:
+    # Guards use the precomputed totals rather than scanning the frames
+    if total_all_citations > 0:
         col1, col2 = st.columns([1, 1])
         
         with col1:
-            st.dataframe(self_citation_df, use_container_width=True)
+            # Values keep full precision (also in the CSV), rounding is applied only when rendering
+            st.dataframe(self_citation_df.style.format({'Self Citation Rate (%)': '{:.2f}'}), use_container_width=True)
         
         with col2:
             st.metric("Total Citations", total_all_citations)
             st.metric("Self-Citations", total_self_citations)
-            if total_all_citations > 0:
-                self_citation_rate = (total_self_citations / total_all_citations) * 100
-                st.metric("Overall Self-Citation Rate", f"{self_citation_rate:.2f}%")
+            self_citation_rate = (total_self_citations / total_all_citations) * 100
+            st.metric("Overall Self-Citation Rate", f"{self_citation_rate:.2f}%")
         
-        # Plot self-citation trend
+        # Plot self-citation trend (native charts are rendered in the browser, not rasterized on the server)
         if len(self_citation_df) > 1:
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
-            
-            # Bar chart
-            ax1.bar(self_citation_df['Year'].astype(str), self_citation_df['Self Citation Rate (%)'])
-            ax1.set_title('Self-Citation Rate by Year')
-            ax1.set_xlabel('Year')
-            ax1.set_ylabel('Self-Citation Rate (%)')
-            ax1.tick_params(axis='x', rotation=45)
-            
-            # Line chart
-            ax2.plot(self_citation_df['Year'].astype(str), self_citation_df['Self Citation Rate (%)'], 
-                    marker='o', linewidth=2, markersize=6, color='red')
-            ax2.set_title('Self-Citation Trend')
-            ax2.set_xlabel('Year')
-            ax2.set_ylabel('Self-Citation Rate (%)')
-            ax2.tick_params(axis='x', rotation=45)
-            ax2.grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            st.pyplot(fig)
+            rate_by_year = self_citation_df.set_index(self_citation_df['Year'].astype(str))['Self Citation Rate (%)']
+            chart_col1, chart_col2 = st.columns(2)
+            with chart_col1:
+                st.caption("Self-Citation Rate by Year")
+                st.bar_chart(rate_by_year)
+            with chart_col2:
+                st.caption("Self-Citation Trend")
+                st.line_chart(rate_by_year, color='#ff0000')
     else:
         st.info("No sufficient self-citation data available")
 
     # 5. Reference Analysis
     st.header(" Reference Quality Analysis")
-    st.dataframe(reference_analysis_df, use_container_width=True)
+    st.dataframe(
+        reference_analysis_df.style.format({'Value': lambda v: f'{v:.2f}' if isinstance(v, float) else v}),
+        use_container_width=True
+    )
 
     # 6. Citation Network Analysis
     st.header(" Citation Network Analysis")
-    if not citation_analysis_df.empty and citation_analysis_df.iloc[0, 0] != '':
-        st.dataframe(citation_analysis_df, use_container_width=True)
+    if citation_summary['top_authors']:
+        st.dataframe(df_to_arrow(citation_analysis_df), use_container_width=True)
         
         # Citation metrics
-        total_citing_authors = len(all_citing_authors)
-        total_citing_journals = len(set(all_citing_journals))
-        total_citing_institutions = len(set(all_citing_institutions))
-        total_citing_countries = len(set(all_citing_countries))
+        total_citing_authors = citation_summary['total_authors']
+        total_citing_journals = citation_summary['unique_journals']
+        total_citing_institutions = citation_summary['unique_institutions']
+        total_citing_countries = citation_summary['unique_countries']
         
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
@@ -954,49 +1249,32 @@ def display_results(author_freq_df, institution_freq_df, self_citation_df,
         with col4:
             st.metric("Citing Countries", total_citing_countries)
         with col5:
-            st.metric("Total Citations", len(all_citing_journals))
+            st.metric("Total Citations", citation_summary['total_citations'])
         
         # Visualization
         if total_citing_journals > 0:
-            fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 6))
-            
-            # Top Citing Journals
-            citing_journal_counts = Counter(all_citing_journals).most_common(10)
-            if citing_journal_counts:
-                journals, counts = zip(*citing_journal_counts)
-                ax1.bar(range(len(journals)), counts)
-                ax1.set_title('Top 10 Citing Journals')
-                ax1.set_xlabel('Journals')
-                ax1.set_ylabel('Citation Count')
-                ax1.set_xticks(range(len(journals)))
-                ax1.set_xticklabels([j[:20] + '...' for j in journals], rotation=45)
-            
-            # Citation Distribution by Country
-            citing_country_counts = Counter(all_citing_countries).most_common(10)
-            if citing_country_counts:
-                countries, country_counts = zip(*citing_country_counts)
-                ax2.pie(country_counts, labels=countries, autopct='%1.1f%%')
-                ax2.set_title('Citation Distribution by Country')
-            else:
-                ax2.text(0.5, 0.5, 'No country data', ha='center', va='center')
-                ax2.set_title('Citation Distribution by Country')
-            
-            # Top Citing Authors
-            author_citation_counts = Counter(all_citing_authors).most_common(10)
-            if author_citation_counts:
-                authors, author_counts = zip(*author_citation_counts)
-                ax3.bar(range(len(authors)), author_counts, color='green')
-                ax3.set_title('Top 10 Citing Authors')
-                ax3.set_xlabel('Authors')
-                ax3.set_ylabel('Citation Count')
-                ax3.set_xticks(range(len(authors)))
-                ax3.set_xticklabels([a[:15] + '...' for a in authors], rotation=45)
-            else:
-                ax3.text(0.5, 0.5, 'No author data', ha='center', va='center')
-                ax3.set_title('Top 10 Citing Authors')
-            
-            plt.tight_layout()
-            st.pyplot(fig)
+            chart_col1, chart_col2, chart_col3 = st.columns(3)
+            with chart_col1:
+                st.caption("Top 10 Citing Journals")
+                st.altair_chart(top_counts_chart(citation_summary['top_journals'], 'Journal'), use_container_width=True)
+            with chart_col2:
+                st.caption("Citation Distribution by Country")
+                country_counts = citation_summary['top_countries']
+                if country_counts:
+                    country_chart_df = pd.DataFrame(country_counts, columns=['Country', 'Citations'])
+                    st.altair_chart(
+                        alt.Chart(country_chart_df).mark_arc().encode(theta='Citations', color='Country'),
+                        use_container_width=True
+                    )
+                else:
+                    st.info("No country data")
+            with chart_col3:
+                st.caption("Top 10 Citing Authors")
+                author_counts = citation_summary['top_authors']
+                if author_counts:
+                    st.altair_chart(top_counts_chart(author_counts, 'Author', color='#2ca02c'), use_container_width=True)
+                else:
+                    st.info("No author data")
     else:
         st.info("No citation analysis data available")
 
@@ -1011,16 +1289,7 @@ def display_results(author_freq_df, institution_freq_df, self_citation_df,
         'citation_analysis.csv': citation_analysis_df
     }
 
-    for filename, dataframe in datasets.items():
-        if not dataframe.empty and len(dataframe) > 0:
-            csv = dataframe.to_csv(index=False, encoding='utf-8')
-            st.download_button(
-                label=f" Download {filename}",
-                data=csv,
-                file_name=filename,
-                mime="text/csv",
-                key=filename
-            )
+    render_downloads(datasets)
 
 if __name__ == "__main__":
     main()